@@ -1,18 +1,149 @@
 import os
-import requests  # For making HTTP requests to APIs and websites
 import time
-from datetime import datetime, timedelta
+import shelve  # For keeping check results on disk between runs
+import asyncio  # For running the network checks concurrently
+import contextlib
+import importlib.util
+import httpx  # For making asynchronous HTTP requests to APIs and websites
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, before_sleep_log  # For retrying rate-limited API calls
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime  # For parsing HTTP-date Retry-After headers
 from email.mime.multipart import MIMEMultipart  # For creating email messages with multiple parts
 from email.mime.text import MIMEText  # For creating text or HTML email content
 import smtplib  # For sending emails via SMTP
-import pytz  # For timezone handling
+from zoneinfo import ZoneInfo  # For timezone handling
 import ssl  # For secure network connections
-import socket  # For network communications
-import json  # For parsing JSON data
+from cryptography import x509  # For reading SSL certificate details
+import orjson  # For fast JSON parsing and encoding
+from collections import deque  # For the sliding window of request latencies
+import html  # For decoding HTML entities in WordPress.org names and escaping the report
 import logging  # For logging information during execution
+from functools import lru_cache  # For caching parsed version numbers
+from packaging.version import Version, InvalidVersion  # For comparing version numbers
+
+try:
+    import uvloop  # Faster event loop for the many concurrent requests; not available on Windows
+except ImportError:
+    uvloop = None
 
 # Configure logging with timestamp and log level
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logging.getLogger('httpx').setLevel(logging.WARNING)  # httpx logs every request at INFO level
+
+# Timezone for reporting (as I'm based in Poland- hence Warsaw).
+POLAND_TZ = ZoneInfo('Europe/Warsaw')
+
+# Errors treated as a failed request: HTTP/connection errors, timeouts and malformed JSON bodies
+HTTP_ERRORS = (httpx.HTTPError, ValueError)
+
+# Headers sent with every request made through the shared client
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0'
+}
+# Connect and read timeouts (in seconds) so a single unresponsive server can't hang the whole run
+HTTP_TIMEOUT = httpx.Timeout(15, connect=5)
+# Connection pool size; keep-alive connections are reused so each host's TLS handshake is paid once
+HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+# HTTP/2 lets many concurrent requests to one host share a single connection; it needs the optional h2 package
+HTTP2 = importlib.util.find_spec('h2') is not None
+# Longest we are willing to wait before retrying, even if the server asks for more
+MAX_RETRY_WAIT = 60
+# PageSpeed runs a full Lighthouse audit before answering, which regularly takes longer than HTTP_TIMEOUT
+PAGESPEED_TIMEOUT = httpx.Timeout(60, connect=5)
+
+def is_retryable(exception):
+    """
+    Decides whether a failed API request is worth retrying.
+    
+    Args:
+        exception (Exception): The error raised by the request
+    
+    Returns:
+        bool: True for rate limiting (429), server errors (5xx), connection errors and timeouts
+    """
+    if isinstance(exception, httpx.HTTPStatusError):
+        status = exception.response.status_code
+        return status == 429 or status >= 500  # 401/403/404 won't get better by retrying
+    return isinstance(exception, httpx.TransportError)  # Connection errors and timeouts
+
+def should_retry(retry_state):
+    """
+    Tenacity retry predicate for request_json().
+    
+    Like is_retryable(), except that read timeouts are not retried for calls made
+    with retry_read_timeout=False (slow endpoints where waiting again won't help).
+    
+    Args:
+        retry_state (tenacity.RetryCallState): State of the call being retried
+    
+    Returns:
+        bool: True if the call should be retried
+    """
+    exception = retry_state.outcome.exception()
+    if exception is None:
+        return False
+    if isinstance(exception, httpx.ReadTimeout) and not retry_state.kwargs.get('retry_read_timeout', True):
+        return False
+    return is_retryable(exception)
+
+def wait_for_rate_limit(retry_state):
+    """
+    Computes how long to wait before the next retry.
+    
+    Honors the server's Retry-After or x-ratelimit-reset headers when present,
+    otherwise backs off exponentially with jitter.
+    
+    Args:
+        retry_state (tenacity.RetryCallState): State of the call being retried
+    
+    Returns:
+        float: Seconds to wait
+    """
+    response = getattr(retry_state.outcome.exception(), 'response', None)
+    headers = response.headers if response is not None else {}
+    retry_after = headers.get('Retry-After')
+    if headers.get('x-ratelimit-remaining') == '0' and not retry_after:
+        retry_after = headers.get('x-ratelimit-reset')
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                # Retry-After may also be an HTTP date
+                seconds = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return min(max(seconds, 0), MAX_RETRY_WAIT)
+    return wait_exponential_jitter(initial=1, max=30)(retry_state)
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_for_rate_limit,
+    retry=should_retry,
+    before_sleep=before_sleep_log(logging.getLogger(), logging.WARNING),
+    reraise=True
+)
+async def request_json(client, method, url, retry_read_timeout=True, **kwargs):
+    """
+    Sends an API request and decodes its JSON response, retrying when rate limited.
+    
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client
+        method (str): HTTP method, e.g. 'GET' or 'POST'
+        url (str): URL to request
+        retry_read_timeout (bool): Whether a read timeout is worth retrying
+        **kwargs: Extra arguments passed to client.request (params, headers, content, timeout, ...)
+    
+    Returns:
+        The decoded JSON response
+    
+    Raises:
+        httpx.HTTPError, ValueError: If the request still fails after retrying
+    """
+    response = await client.request(method, url, **kwargs)
+    response.raise_for_status()  # Raise exception for bad HTTP status
+    return orjson.loads(response.content)
 
 def add_scheme(url):
     """
@@ -28,51 +159,230 @@ def add_scheme(url):
         return 'https://' + url  # Add 'https://' if missing
     return url
 
-def fetch_wp_directory(slug, type='plugin'):
+# How long (in seconds) results are reused from the on-disk cache, per kind of check
+CACHE_TTLS = {
+    'ssl': 12 * 3600,        # Certificates change every few months
+    'pagespeed': 6 * 3600,   # Lighthouse scores shift over days
+    'safebrowsing': 3600,
+    'wp': 3600,              # Latest plugin/theme versions on WordPress.org
+}
+# Marker for a value that isn't in the cache (None is a valid cached value)
+CACHE_MISS = object()
+
+class ResultCache:
+    """
+    Disk-backed cache of check results, so scheduled runs close together don't re-query every API.
+    
+    The file is opened on first use. Persist it between GitHub Actions runs with actions/cache.
+    """
+
+    def __init__(self, path, ttls):
+        """
+        Args:
+            path (str): Path of the shelve file
+            ttls (dict): Seconds each kind of result stays valid
+        """
+        self.path = path
+        self.ttls = ttls
+        self._shelf = None
+
+    def _open(self):
+        if self._shelf is None:
+            self._shelf = shelve.open(self.path)
+        return self._shelf
+
+    def get(self, kind, key):
+        """
+        Returns a cached result, or CACHE_MISS if there's none or it has expired.
+        
+        Args:
+            kind (str): Kind of check, a key of CACHE_TTLS
+            key (str): What was checked, e.g. the URL
+        """
+        entry = self._open().get(f"{kind}:{key}")
+        if entry is None:
+            return CACHE_MISS
+        stored_at, value = entry
+        if time.time() - stored_at > self.ttls[kind]:
+            return CACHE_MISS
+        return value
+
+    def set(self, kind, key, value):
+        """
+        Stores a result.
+        
+        Args:
+            kind (str): Kind of check, a key of CACHE_TTLS
+            key (str): What was checked, e.g. the URL
+            value: Picklable result
+        """
+        self._open()[f"{kind}:{key}"] = (time.time(), value)
+
+    def close(self):
+        """Writes the cache to disk and closes it."""
+        if self._shelf is not None:
+            self._shelf.close()
+            self._shelf = None
+
+result_cache = ResultCache(os.getenv('CACHE_PATH', '.wp-warden-cache'), CACHE_TTLS)
+
+async def persisted(kind, key, fetch, keep=lambda value: True):
+    """
+    Returns a result from the on-disk cache, or runs fetch() and caches its result.
+    
+    Args:
+        kind (str): Kind of check, a key of CACHE_TTLS
+        key (str): What was checked, e.g. the URL
+        fetch (callable): Returns the coroutine performing the check
+        keep (callable): Decides whether a result is worth caching (failures usually aren't)
+    
+    Returns:
+        The cached or freshly fetched result
+    """
+    value = result_cache.get(kind, key)
+    if value is CACHE_MISS:
+        value = await fetch()
+        if keep(value):
+            result_cache.set(kind, key, value)
+    return value
+
+# Response fields requested from WordPress.org. We only read the name, slug and version;
+# the changelog, screenshots etc. make up nearly all of a ~200KB response, so they are switched off
+WP_FIELDS = {
+    'version': True,
+    'sections': False,
+    'description': False,
+    'short_description': False,
+    'screenshots': False,
+    'banners': False,
+    'icons': False,
+    'reviews': False,
+    'versions': False,
+    'contributors': False,
+    'compatibility': False,
+    'ratings': False,
+    'rating': False,
+    'num_ratings': False,
+    'downloaded': False,
+    'active_installs': False,
+    'tags': False,
+}
+
+# List of premium themes/plugins that shouldn't be checked against WP directory
+EXEMPT_SLUGS = frozenset({
+    'avada', 'avada-builder', 'avada-core', 'avada-child',
+    'avadachild', 'avada_child', 'avadacore', 'avada_core',
+    'avadabuilder', 'avada_builder'
+})
+
+async def wp_request(client, type, action, **request_args):
+    """
+    Queries the WordPress.org plugins or themes info API, asking only for the fields in WP_FIELDS.
+    
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client
+        type (str): Either 'plugin' or 'theme'
+        action (str): API action, e.g. 'plugin_information' or 'query_themes'
+        **request_args: Request arguments, sent as request[<name>]=<value> (slug, search, per_page, ...)
+    
+    Returns:
+        The decoded JSON response
+    
+    Raises:
+        httpx.HTTPError, ValueError: If the request fails
+    """
+    params = {'action': action}
+    params.update({f'request[{name}]': value for name, value in request_args.items()})
+    params.update({f'request[fields][{field}]': str(value).lower() for field, value in WP_FIELDS.items()})
+    return await request_json(client, 'GET', f"https://api.wordpress.org/{type}s/info/1.2/", params=params)
+
+# Latest versions looked up on WordPress.org during this run, keyed on (slug, type) and (name, type).
+# Values are tasks so sites asking for the same item at the same time share a single request.
+wp_directory_cache = {}
+wp_search_cache = {}
+
+async def cached_lookup(cache, key, fetch):
+    """
+    Runs fetch() once per key and shares its result with every caller.
+    
+    Failed lookups are dropped from the cache so a later call can retry them.
+    
+    Args:
+        cache (dict): Cache mapping keys to lookup tasks
+        key (hashable): Cache key
+        fetch (callable): Returns the coroutine performing the lookup
+    
+    Returns:
+        The result of the lookup
+    """
+    task = cache.get(key)
+    if task is None:
+        task = cache[key] = asyncio.ensure_future(fetch())
+    try:
+        return await task
+    except HTTP_ERRORS:
+        if cache.get(key) is task:
+            del cache[key]
+        raise
+
+async def _fetch_wp_directory_raw(client, slug, type):
     """
-    Fetches version information from the WordPress.org API.
+    Queries the WordPress.org API for the latest version of a slug.
     
     Args:
+        client (httpx.AsyncClient): Shared HTTP client
         slug (str): Plugin or theme slug to check
         type (str): Either 'plugin' or 'theme'
     
     Returns:
-        dict or None: Version information dict or None if not found
+        str or None: Latest version string or None if the slug doesn't exist
+    
+    Raises:
+        httpx.HTTPError, ValueError: If the request fails
+    """
+    try:
+        info = await wp_request(client, type, f'{type}_information', slug=slug)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return None  # Unknown slug; a valid answer worth caching
+        raise
+    return info.get('version') if isinstance(info, dict) else None
+
+async def fetch_wp_directory(client, slug, type='plugin'):
     """
-    # List of premium themes/plugins that shouldn't be checked against WP directory
-    exempt_slugs = [
-        'avada', 'avada-builder', 'avada-core', 'avada-child',
-        'avadachild', 'avada_child', 'avadacore', 'avada_core',
-        'avadabuilder', 'avada_builder'
-    ]
+    Fetches the latest version of a plugin or theme from the WordPress.org API.
+    
+    Results (including slugs that don't exist) are cached for the rest of the run,
+    so a plugin installed on many sites is looked up only once.
     
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client
+        slug (str): Plugin or theme slug to check
+        type (str): Either 'plugin' or 'theme'
+    
+    Returns:
+        str or None: Latest version string or None if not found
+    """
     # Skip WordPress.org check for exempt items
-    if slug.lower() in exempt_slugs:
+    if slug.lower() in EXEMPT_SLUGS:
         logging.info(f"Exempting {slug} from WordPress API checks.")
         return None
-        
-    # Construct the appropriate WordPress API URL based on type
-    if type == 'plugin':
-        # API endpoint for plugins
-        api_url = f"https://api.wordpress.org/plugins/info/1.2/?action=plugin_information&request[slug]={slug}"
-    else:
-        # API endpoint for themes
-        api_url = f"https://api.wordpress.org/themes/info/1.2/?action=theme_information&request[slug]={slug}"
-    
+
     # Make the API request with error handling
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()  # Raise exception for bad HTTP status
-        return response.json()  # Return the JSON response as a dictionary
-    except requests.RequestException as e:
+        return await cached_lookup(wp_directory_cache, (slug, type), lambda: persisted(
+            'wp', f"directory:{type}:{slug}", lambda: _fetch_wp_directory_raw(client, slug, type)
+        ))
+    except HTTP_ERRORS as e:
         logging.error(f"Error fetching {type} info for {slug}: {e}")
         return None
 # Fetch info from Envato Shop website about the installed premium themes/plugins that are not installed from WP directory
-def fetch_envato_version(item_id):
+async def fetch_envato_version(client, item_id):
     """
     Fetches version information from Envato API for premium items.
     
     Args:
+        client (httpx.AsyncClient): Shared HTTP client
         item_id (str): Envato item ID
     
     Returns:
@@ -84,12 +394,10 @@ def fetch_envato_version(item_id):
         "Authorization": f"Bearer {os.getenv('ENVATO_API_KEY')}"  # ENVATO_API_KEY must be set in environment variables (as a Github Action Secret)
     }
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raise exception for bad HTTP status
-        data = response.json()
+        data = await request_json(client, 'GET', url, headers=headers)
         # Return the latest version for themes or plugins
         return data.get("wordpress_theme_latest_version") or data.get("wordpress_plugin_latest_version")
-    except requests.RequestException as e:
+    except HTTP_ERRORS as e:
         logging.error(f"Error fetching Envato info for item ID {item_id}: {e}")
         return None
 
@@ -98,47 +406,135 @@ envato_items = {
     'avada': '2833226', # Avada Wordpress template (quite popular - good as an example). The number is taken from the Envato api documentation.
 }
 
+# Handle specific known cases for plugins and themes. Gods.. have anyone ever heard about something like standardisation? Wordpress themes and plugins directory haven't.
+# Keys are casefolded once here so lookups ignore case.
+SPECIAL_CASE_SLUGS = {name.casefold(): slug for name, slug in {
+    # Plugins are only as an example. you need to populate this list by yourselft by the 'Trails of Errors'.
+    'Cookie-Banner-Plugin für WordPress – Cookiebot CMP by Usercentrics': 'cookiebot',
+    'Complianz – GDPR/CCPA Cookie Consent': 'complianz-gdpr',
+    'Yoast SEO': 'wordpress-seo',
+    'WP Social Widget': 'wp-social-widget',
+    'Smush': 'wp-smushit',
+    'Self-Hosted Google Fonts': 'selfhost-google-fonts',
+    'ShortPixel Image Optimizer': 'shortpixel-image-optimiser',
+    'WPCode Lite': 'insert-headers-and-footers',
+    # Themes- same as plugins - you are on your own here.
+    'Twenty Twenty-Four': 'twentytwentyfour',
+}.items()}
+
 def generate_slugs(name):
     """
     Generates possible slugs for a plugin or theme name.
     
+    Slugs are produced lazily, so a membership test (checking a search hit or
+    an exemption) stops building candidates at the first match.
+    
     Args:
         name (str): The name of the plugin or theme
     
+    Yields:
+        str: Possible slug strings, most likely first
+    """
+    special_case = SPECIAL_CASE_SLUGS.get(name.casefold())
+    if special_case:
+        yield special_case
+        return
+
+    # Generate general slugs by manipulating the name
+    lowered = name.lower()
+    yield lowered.replace(' ', '-')
+    yield lowered.replace(' ', '_')
+    yield lowered.replace(' ', '')
+    yield lowered.replace(' ', '-').replace('.', '')
+
+async def _fetch_wp_by_search_raw(client, name, type):
+    """
+    Searches the WordPress.org directory for a plugin or theme name.
+    
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client
+        name (str): The name of the plugin or theme
+        type (str): Either 'plugin' or 'theme'
+    
     Returns:
-        list: List of possible slug strings
-    """
-    # Handle specific known cases for plugins and themes. Gods.. have anyone ever heard about something like standardisation? Wordpress themes and plugins directory haven't.
-    special_cases = {
-        # Plugins are only as an example. you need to populate this list by yourselft by the 'Trails of Errors'.
-        'Cookie-Banner-Plugin für WordPress – Cookiebot CMP by Usercentrics': 'cookiebot',
-        'Complianz – GDPR/CCPA Cookie Consent': 'complianz-gdpr',
-        'Yoast SEO': 'wordpress-seo',
-        'WP Social Widget': 'wp-social-widget',
-        'Smush': 'wp-smushit',
-        'Self-Hosted Google Fonts': 'selfhost-google-fonts',
-        'ShortPixel Image Optimizer': 'shortpixel-image-optimiser',
-        'WPCode Lite': 'insert-headers-and-footers',
-        # Themes- same as plugins - you are on your own here.
-        'Twenty Twenty-Four': 'twentytwentyfour',
-    }
-    if name in special_cases:
-        return [special_cases[name]]
+        str or None: Latest version of the top hit, or None if it isn't the item we're looking for
     
-    # Generate general slugs by manipulating the name
-    slugs = [
-        name.lower().replace(' ', '-'),
-        name.lower().replace(' ', '_'),
-        name.lower().replace(' ', ''),
-        name.lower().replace(' ', '-').replace('.', '')
-    ]
-    return slugs
+    Raises:
+        httpx.HTTPError, ValueError: If the request fails
+    """
+    # Only the top hit is needed; the API would otherwise return a page of 24
+    data = await wp_request(client, type, f'query_{type}s', search=name, per_page=1)
+
+    hits = data.get(f'{type}s') if isinstance(data, dict) else None
+    if not hits:
+        return None
+    hit = hits[0]
+    # Search is fuzzy; only trust the top hit if it really is the installed item
+    if html.unescape(hit.get('name', '')).casefold() != name.casefold() and hit.get('slug') not in generate_slugs(name):
+        return None
+    return hit.get('version')
+
+async def fetch_wp_by_search(client, name, type='plugin'):
+    """
+    Resolves a plugin or theme name to its latest version with a single directory search.
+    
+    Results are cached for the rest of the run.
+    
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client
+        name (str): The name of the plugin or theme
+        type (str): Either 'plugin' or 'theme'
+    
+    Returns:
+        str or None: Latest version string or None if not found
+    """
+    try:
+        return await cached_lookup(wp_search_cache, (name, type), lambda: persisted(
+            'wp', f"search:{type}:{name}", lambda: _fetch_wp_by_search_raw(client, name, type)
+        ))
+    except HTTP_ERRORS as e:
+        logging.error(f"Error searching {type}s for {name}: {e}")
+        return None
 
-def get_versions(url):
+async def find_wp_version(client, name, type='plugin'):
+    """
+    Looks up the latest WordPress.org version for a plugin or theme name.
+    
+    A directory search resolves most names in one request. Otherwise all slug
+    candidates are queried concurrently; the first candidate (in generate_slugs
+    order) that resolves to a version wins.
+    
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client
+        name (str): The name of the plugin or theme
+        type (str): Either 'plugin' or 'theme'
+    
+    Returns:
+        str: Latest version string or 'Unknown' if not found
+    """
+    # Premium items aren't on WordPress.org; a search would only turn up a look-alike
+    if any(slug.lower() in EXEMPT_SLUGS for slug in generate_slugs(name)):
+        logging.info(f"Exempting {name} from WordPress API checks.")
+        return 'Unknown'
+
+    version = await fetch_wp_by_search(client, name, type)
+    if version:
+        return version
+
+    # Fall back to guessing the slug
+    slugs = generate_slugs(name)
+    versions = await asyncio.gather(*[fetch_wp_directory(client, slug, type) for slug in slugs])
+    for version in versions:
+        if version:
+            return version
+    return 'Unknown'  # Set as 'Unknown' if not found
+
+async def get_versions(client, url):
     """
     Retrieves version information for a WordPress site.
     
     Args:
+        client (httpx.AsyncClient): Shared HTTP client
         url (str): The URL of the WordPress site
     
     Returns:
@@ -147,57 +543,46 @@ def get_versions(url):
     url = add_scheme(url)
     version_info_url = f"{url}/version-info.php"  # URL to the version info script installed on the website. Name it as you want it.
     headers = {
-        'User-Agent': 'Mozilla/5.0',
-        'X-Auth-Key': os.getenv('GH_TOKEN')  # Authentication header; GH_TOKEN should be set in environment variables (as a Github Action Secret).
+        'X-Auth-Key': os.getenv('GH_TOKEN', '')  # Authentication header; GH_TOKEN should be set in environment variables (as a Github Action Secret). Sent only to the site itself.
     }
     try:
-        response = requests.get(version_info_url, headers=headers)
+        response = await client.get(version_info_url, headers=headers)
         response.raise_for_status()  # Raise exception for bad HTTP status
-        version_info = response.json()
+        version_info = orjson.loads(response.content)
         php_version = version_info.get('php_version', 'Unknown')
         wp_version = version_info.get('wp_version', 'Unknown')
         plugins = version_info.get('plugins', [])
         themes = version_info.get('themes', [])
-
-        # Update plugins with their latest versions
-        for plugin in plugins:
-            plugin_name = plugin['name']
-            for slug in generate_slugs(plugin_name):
-                plugin_info = fetch_wp_directory(slug, 'plugin')
-                if plugin_info and 'version' in plugin_info:
-                    plugin['latest_version'] = plugin_info['version']
-                    break  # Break if version is found
-            else:
-                plugin['latest_version'] = 'Unknown'  # Set as 'Unknown' if not found
-
-        # Update themes with their latest versions
-        for theme in themes:
-            theme_name = theme['name']
-            if theme_name.lower() in ['avada', 'avada child']:
-                # Handle Avada theme separately using Envato API
-                theme_info = None
-                if theme_name.lower() == 'avada':
-                    theme_info = fetch_envato_version(envato_items['avada'])
-                theme['latest_version'] = theme_info if theme_info else theme['version']
-            else:
-                for slug in generate_slugs(theme_name):
-                    theme_info = fetch_wp_directory(slug, 'theme')
-                    if theme_info and 'version' in theme_info:
-                        theme['latest_version'] = theme_info['version']
-                        break  # Break if version is found
-                else:
-                    theme['latest_version'] = 'Unknown'  # Set as 'Unknown' if not found
-
-    except requests.RequestException as e:
+    except HTTP_ERRORS as e:
         logging.error(f"Error fetching version info for {url}: {e}")
-        php_version = 'Unknown'
-        wp_version = 'Unknown'
-        plugins = []
-        themes = []
+        return 'Unknown', 'Unknown', [], []
+
+    async def update_plugin(plugin):
+        plugin['latest_version'] = await find_wp_version(client, plugin['name'], 'plugin')
+
+    async def update_theme(theme):
+        theme_name = theme['name']
+        if theme_name.lower() in ['avada', 'avada child']:
+            # Handle Avada theme separately using Envato API
+            theme_info = None
+            if theme_name.lower() == 'avada':
+                theme_info = await fetch_envato_version(client, envato_items['avada'])
+            theme['latest_version'] = theme_info if theme_info else theme['version']
+        else:
+            theme['latest_version'] = await find_wp_version(client, theme_name, 'theme')
+
+    # Update plugins and themes with their latest versions concurrently
+    await asyncio.gather(
+        *[update_plugin(plugin) for plugin in plugins],
+        *[update_theme(theme) for theme in themes]
+    )
 
     return php_version, wp_version, plugins, themes
 
-def check_ssl_certificate(url):
+# Seconds allowed for connecting and completing the TLS handshake when checking a certificate
+SSL_TIMEOUT = 10
+
+async def check_ssl_certificate(url):
     """
     Checks the SSL certificate of the given URL.
     
@@ -205,26 +590,36 @@ def check_ssl_certificate(url):
         url (str): The URL to check
     
     Returns:
-        tuple: (bool indicating validity, expiry date or error message)
+        tuple: (bool indicating validity, timezone-aware UTC expiry date or error message)
     """
     try:
         hostname = url.split("//")[-1].split("/")[0]  # Extract the hostname from the URL
         context = ssl.create_default_context()
-        with socket.create_connection((hostname, 443)) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert = ssock.getpeercert()
-                # Parse the expiry date of the certificate
-                expiry_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                return True, expiry_date  # Return validity and expiry date
+        # The TLS handshake (and certificate validation) happens while connecting, without blocking the event loop
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(hostname, 443, ssl=context, server_hostname=hostname),
+            SSL_TIMEOUT
+        )
+        try:
+            der_cert = writer.get_extra_info('ssl_object').getpeercert(binary_form=True)
+        finally:
+            writer.close()
+            # Let the TLS connection shut down cleanly; errors while closing don't affect the result
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(writer.wait_closed(), SSL_TIMEOUT)
+        # Read the expiry date straight from the DER certificate; it is already timezone-aware UTC
+        expiry_date = x509.load_der_x509_certificate(der_cert).not_valid_after_utc
+        return True, expiry_date  # Return validity and expiry date
     except Exception as e:
         logging.error(f"Error checking SSL certificate for {url}: {e}")
         return False, str(e)  # Return invalidity and error message
 
-def get_performance_metrics(url):
+async def get_performance_metrics(client, url):
     """
     Retrieves performance metrics using Google PageSpeed Insights API.
     
     Args:
+        client (httpx.AsyncClient): Shared HTTP client
         url (str): The URL to check
     
     Returns:
@@ -236,82 +631,184 @@ def get_performance_metrics(url):
         return 'N/A'
     
     url = add_scheme(url)
-    api_url = f"https://www.googleapis.com/pagespeedonline/v5/runPagespeed?url={url}&key={api_key}"
+    api_url = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
+    params = {
+        'url': url,
+        'key': api_key
+    }
     
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
+        # A timed-out audit is not retried: it would cost another Lighthouse run of quota and likely time out again
+        data = await request_json(client, 'GET', api_url, params=params, timeout=PAGESPEED_TIMEOUT, retry_read_timeout=False)
         # Extract performance score from the API response
         performance_score = data['lighthouseResult']['categories']['performance']['score'] * 100
         return performance_score
-    except requests.RequestException as e:
+    except HTTP_ERRORS as e:
         logging.error(f"Error fetching performance metrics for {url}: {e}")
         return 'N/A'
     except KeyError:
         logging.error("Required data not found in PageSpeed Insights API response.")
         return 'N/A'
 
-def scan_for_malware(url):
+# Most URLs the Safe Browsing API accepts in a single threatMatches:find request
+SAFE_BROWSING_BATCH_SIZE = 500
+
+async def scan_for_malware_batch(client, urls):
     """
-    Scans the URL for malware using Google Safe Browsing API.
+    Scans URLs for malware using Google Safe Browsing API.
+    
+    All URLs are sent in one request (or one per 500 URLs) instead of one request per site.
     
     Args:
-        url (str): The URL to scan
+        client (httpx.AsyncClient): Shared HTTP client
+        urls (list): The URLs to scan
     
     Returns:
-        str: 'Malware found', 'No malware detected', or 'Scan failed'
+        dict: Maps each URL to 'Malware found', 'No malware detected', or 'Scan failed'
     """
     api_url = "https://safebrowsing.googleapis.com/v4/threatMatches:find"
-    payload = {
-        "client": {
-            "clientId": "yourcompanyname",
-            "clientVersion": "1.0"
-        },
-        "threatInfo": {
-            "threatTypes": ["MALWARE", "SOCIAL_ENGINEERING"],
-            "platformTypes": ["ANY_PLATFORM"],
-            "threatEntryTypes": ["URL"],
-            "threatEntries": [{"url": url}]
-        }
-    }
     headers = {
         'Content-Type': 'application/json'
     }
     params = {
-        'key': os.getenv('SAFE_BROWSING_API_KEY')  # API key must be set in environment variables (as a Github Action Secret).
+        'key': os.getenv('SAFE_BROWSING_API_KEY', '')  # API key must be set in environment variables (as a Github Action Secret).
     }
 
-    try:
-        response = requests.post(api_url, headers=headers, params=params, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        if 'matches' in data and data['matches']:
-            return "Malware found"
-        else:
-            return "No malware detected"
-    except requests.RequestException as e:
-        logging.error(f"Error scanning for malware on {url}: {e}")
-        return "Scan failed"
+    async def scan_batch(batch):
+        payload = {
+            "client": {
+                "clientId": "yourcompanyname",
+                "clientVersion": "1.0"
+            },
+            "threatInfo": {
+                "threatTypes": ["MALWARE", "SOCIAL_ENGINEERING"],
+                "platformTypes": ["ANY_PLATFORM"],
+                "threatEntryTypes": ["URL"],
+                "threatEntries": [{"url": url} for url in batch]
+            }
+        }
+        try:
+            data = await request_json(client, 'POST', api_url, headers=headers, params=params, content=orjson.dumps(payload))
+        except HTTP_ERRORS as e:
+            logging.error(f"Error scanning for malware on {', '.join(batch)}: {e}")
+            return {url: "Scan failed" for url in batch}
+        # The API only lists the URLs it has threats for
+        matches = (data.get('matches') or []) if isinstance(data, dict) else []
+        infected = set()
+        for match in matches:
+            threat = match.get('threat') if isinstance(match, dict) else None
+            threat_url = threat.get('url') if isinstance(threat, dict) else None
+            if not threat_url:
+                # Can't tell which site the match belongs to
+                logging.error(f"Unexpected match in Safe Browsing API response: {match}")
+                return {url: "Scan failed" for url in batch}
+            infected.add(threat_url)
+        return {url: "Malware found" if url in infected else "No malware detected" for url in batch}
+
+    # Only scan URLs without a recent result
+    statuses = {}
+    for url in urls:
+        status = result_cache.get('safebrowsing', url)
+        if status is not CACHE_MISS:
+            statuses[url] = status
+    to_scan = [url for url in urls if url not in statuses]
 
-def check_uptime(url):
+    batches = [to_scan[i:i + SAFE_BROWSING_BATCH_SIZE] for i in range(0, len(to_scan), SAFE_BROWSING_BATCH_SIZE)]
+    for batch_statuses in await asyncio.gather(*[scan_batch(batch) for batch in batches]):
+        for url, status in batch_statuses.items():
+            if status != "Scan failed":
+                result_cache.set('safebrowsing', url, status)
+        statuses.update(batch_statuses)
+    return statuses
+
+# Connect and read timeouts (in seconds) for the uptime check
+UPTIME_TIMEOUT = httpx.Timeout(10, connect=5)
+
+async def check_uptime(client, url):
     """
     Checks if the website is online.
     
+    Only the response status is needed, so a HEAD request is sent instead of
+    downloading the whole homepage.
+    
     Args:
+        client (httpx.AsyncClient): Shared HTTP client
         url (str): The URL to check
     
     Returns:
         str: 'Online' or 'Error' with HTML color coding
     """
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        response = await client.head(url, timeout=UPTIME_TIMEOUT)
+        if response.is_error:
+            # Some servers reject HEAD; confirm with a GET but don't download the body
+            async with client.stream('GET', url, timeout=UPTIME_TIMEOUT) as response:
+                response.raise_for_status()
         return "<span style='color:green;'>Online</span>"
-    except requests.RequestException as e:
+    except HTTP_ERRORS as e:
         logging.error(f"Error checking uptime for {url}: {e}")
         return "<span style='color:red;'>Error</span>"
 
+class SMTPMailer:
+    """
+    Keeps one authenticated SMTP connection open for sending any number of emails.
+    
+    Use as a context manager: the connection is opened, secured with STARTTLS and
+    logged in on entry, and closed on exit.
+    """
+
+    def __init__(self):
+        # Fetch SMTP details from environment variables
+        self.from_email = os.getenv('EMAIL_ADDRESS')  # Sender's email address from environment variable (as a Github Action Secret).
+        self.smtp_server = os.getenv('SMTP_SERVER')  # SMTP server address; should be set in environment variables (as a Github Action Secret).
+        self.smtp_port = int(os.getenv('SMTP_PORT'))  # SMTP server port; usually 587 for TLS (also set as a Github Action Secret)
+        self.smtp_user = os.getenv('SMTP_USER')  # SMTP username; typically the email address (set as a Github Action Secret)
+        self.smtp_password = os.getenv('SMTP_PASSWORD')  # SMTP password; email account password (obviously set as a Github Action Secret)
+        # smtp_server value needs to be set in environment variables (e.g., 'smtp.gmail.com' or your SMTP server)
+        # smtp_port value is set in environment variables (common ports: 587 for TLS, 465 for SSL)
+        # smtp_user is your email address or username used for SMTP authentication
+        # smtp_password is the password for your email account used for SMTP authentication
+        self.server = None
+
+    def __enter__(self):
+        # Connect to the SMTP server with a secure TLS connection
+        self.server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            self.server.starttls()  # Start TLS encryption
+            self.server.login(self.smtp_user, self.smtp_password)  # Log in to the SMTP server with credentials
+        except Exception:
+            self.server.close()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.server.quit()
+        except smtplib.SMTPException:
+            self.server.close()  # Connection already gone; nothing left to say goodbye to
+
+    def send(self, subject, body, to_emails):
+        """
+        Sends an email with the given subject and body to the specified recipients.
+        
+        Args:
+            subject (str): Email subject
+            body (str): Email body in HTML format
+            to_emails (list): List of recipient email addresses
+        
+        Returns:
+            None
+        """
+        # Setup the MIME message
+        message = MIMEMultipart()
+        message['From'] = self.from_email
+        message['To'] = ', '.join(to_emails)
+        message['Subject'] = subject
+        message.attach(MIMEText(body, 'html'))
+
+        # Send the message object directly instead of rendering it to a string first
+        self.server.send_message(message, self.from_email, to_emails)
+
 def send_email(subject, body, to_emails):
     """
     Sends an email with the given subject and body to the specified recipients.
@@ -324,118 +821,329 @@ def send_email(subject, body, to_emails):
     Returns:
         None
     """
-    from_email = os.getenv('EMAIL_ADDRESS')  # Sender's email address from environment variable (as a Github Action Secret).
-    email_password = os.getenv('EMAIL_PASSWORD')  # Sender's email password from environment variable (as a Github Action Secret).
-
-    # Setup the MIME message
-    message = MIMEMultipart()
-    message['From'] = from_email
-    message['To'] = ', '.join(to_emails)
-    message['Subject'] = subject
-    message.attach(MIMEText(body, 'html'))
-
     try:
-        # Fetch SMTP details from environment variables
-        smtp_server = os.getenv('SMTP_SERVER')  # SMTP server address; should be set in environment variables (as a Github Action Secret).
-        smtp_port = int(os.getenv('SMTP_PORT'))  # SMTP server port; usually 587 for TLS (also set as a Github Action Secret)
-        smtp_user = os.getenv('SMTP_USER')  # SMTP username; typically the email address (set as a Github Action Secret)
-        smtp_password = os.getenv('SMTP_PASSWORD')  # SMTP password; email account password (obviously set as a Github Action Secret)
-        # smtp_server value needs to be set in environment variables (e.g., 'smtp.gmail.com' or your SMTP server)
-        # smtp_port value is set in environment variables (common ports: 587 for TLS, 465 for SSL)
-        # smtp_user is your email address or username used for SMTP authentication
-        # smtp_password is the password for your email account used for SMTP authentication
-
-        # Connect to the SMTP server with a secure TLS connection
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()  # Start TLS encryption
-        server.login(smtp_user, smtp_password)  # Log in to the SMTP server with credentials
-
-        # Send the email
-        server.sendmail(from_email, to_emails, message.as_string())
-        server.quit()
+        with SMTPMailer() as mailer:
+            mailer.send(subject, body, to_emails)
         logging.info("Email sent successfully!")
     except Exception as e:
         logging.error(f"Failed to send email: {e}")
 
-def main():
+# Rate-limited API hosts whose errors tell us whether we are sending too much.
+# Errors from the monitored sites are deliberately left out: a site that is down is what we report,
+# not a reason to slow down. A 429 is an explicit "slow down" and is honoured from any host.
+API_HOSTS = frozenset({
+    'api.wordpress.org',
+    'api.envato.com',
+    'www.googleapis.com',
+    'safebrowsing.googleapis.com',
+})
+
+class AdaptiveConcurrency:
     """
-    Main function to orchestrate the monitoring and reporting processes.
+    Limits how many sites are checked at once, adapting to how the servers respond (AIMD).
+    
+    Every completed site raises the limit by 0.5 up to the maximum; a 429 from any host,
+    or a 5xx or connection error from one of the API_HOSTS, halves it. While the latest site took much
+    longer than the recent average the limit is held instead of raised.
+    
+    Use as an async context manager around the work for a site, and pass it to
+    create_client() so it can observe the API requests.
+    """
+
+    def __init__(self, initial=2, maximum=10, window=20):
+        """
+        Args:
+            initial (int): Number of sites checked concurrently at start
+            maximum (int): Upper bound for the number of concurrent sites
+            window (int): Number of recent site durations to average over
+        """
+        self.limit = float(initial)
+        self.maximum = maximum
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def record(self, latency):
+        """
+        Updates the limit after a site has been checked completely.
+        
+        Args:
+            latency (float): How long checking the site took, in seconds
+        """
+        async with self._condition:
+            slow = bool(self.latencies) and latency > 2 * sum(self.latencies) / len(self.latencies)
+            self.latencies.append(latency)
+            if not slow:
+                self.limit = min(self.maximum, self.limit + 0.5)  # Additive increase
+            self._condition.notify_all()
+
+    def back_off(self):
+        """
+        Halves the limit after an API reported overload (multiplicative decrease).
+        """
+        self.limit = max(1.0, self.limit * 0.5)
+
+class ObservedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that tells an AdaptiveConcurrency limiter when a host asks us to slow down.
+    """
+
+    def __init__(self, transport, limiter):
+        """
+        Args:
+            transport (httpx.AsyncBaseTransport): Transport that actually sends the requests
+            limiter (AdaptiveConcurrency): Limiter to notify
+        """
+        self._transport = transport
+        self._limiter = limiter
+
+    async def handle_async_request(self, request):
+        observed = request.url.host in API_HOSTS
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.ReadTimeout:
+            raise  # A slow answer (e.g. a long PageSpeed audit) isn't a sign of overload
+        except httpx.TransportError:
+            if observed:
+                self._limiter.back_off()
+            raise
+        if response.status_code == 429 or (observed and response.status_code >= 500):
+            self._limiter.back_off()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+def create_client(limiter=None):
+    """
+    Creates the HTTP client shared by all checks.
+    
+    The pool keeps connections alive, so the TCP and TLS handshake to each host
+    (api.wordpress.org, googleapis.com, ...) is paid only once. With HTTP/2 the
+    concurrent requests to a host are multiplexed over that one connection.
+    
+    Args:
+        limiter (AdaptiveConcurrency): Optional limiter notified about API overload
     
     Returns:
-        None
+        httpx.AsyncClient: Client with pooled connections, default headers and timeouts
     """
-    # Get the list of URLs and recipient emails from environment variables
-    urls = os.getenv('URLS').split(',')  # List of URLs to check
-    to_emails = os.getenv('TO_EMAIL').split(',')  # List of recipient email addresses
-    poland_tz = pytz.timezone('Europe/Warsaw')  # Timezone for reporting (as I'm based in Poland- hence Warsaw).
+    transport = httpx.AsyncHTTPTransport(http2=HTTP2, limits=HTTP_LIMITS)
+    if limiter:
+        transport = ObservedTransport(transport, limiter)
+    return httpx.AsyncClient(
+        transport=transport,
+        headers=DEFAULT_HEADERS,
+        timeout=HTTP_TIMEOUT,
+        follow_redirects=True  # Like a browser, count a site as up if it redirects to a working page
+    )
+
+async def process_url(client, url, current_time):
+    """
+    Runs every check for a single site concurrently.
+    
+    The malware scan is done for all sites at once in process_all().
+    
+    Args:
+        client (httpx.AsyncClient): Shared HTTP client
+        url (str): The URL of the WordPress site
+        current_time (datetime): Start of the run in POLAND_TZ, for working out SSL expiry
+    
+    Returns:
+        dict: Compiled results for the site
+    """
+    logging.info(f"Processing URL: {url}")
 
-    results = []  # List to store the results for each site
+    # Get versions, SSL status, performance score and uptime status at the same time
+    (php_version, wp_version, plugins, themes), (ssl_valid, ssl_info), performance_score, uptime_status = await asyncio.gather(
+        get_versions(client, url),
+        persisted('ssl', url, lambda: check_ssl_certificate(url), keep=lambda ssl_result: ssl_result[0]),
+        persisted('pagespeed', url, lambda: get_performance_metrics(client, url), keep=lambda score: score != 'N/A'),
+        check_uptime(client, url)
+    )
 
-    for url in urls:
-        url = add_scheme(url.strip())
-        logging.info(f"Processing URL: {url}")
-
-        # Get versions and component info
-        php_version, wp_version, plugins, themes = get_versions(url)
-
-        # Check SSL certificate status and expiry
-        ssl_valid, ssl_info = check_ssl_certificate(url)
-        if ssl_valid and isinstance(ssl_info, datetime):
-            # SSL certificate is valid; calculate time until expiry
-            current_time = datetime.now(poland_tz)
-            ssl_info = ssl_info.replace(tzinfo=pytz.UTC)  # Ensure timezone-aware
-            days_until_expiry = (ssl_info - current_time).days
-
-            # Set color based on days until expiry
-            if days_until_expiry > 30:
-                ssl_expiry_color = 'green'
-            elif days_until_expiry > 0:
-                ssl_expiry_color = 'orange'
-            else:
-                ssl_expiry_color = 'red'
-
-            ssl_status = "<span style='color:green;'>Valid</span>"
-            ssl_expiry_date = ssl_info.astimezone(poland_tz).strftime('%Y-%m-%d') # Again - the time format is set for Poland.
+    # Work out how plugins and themes are shown in the report once, up front
+    annotate_components(plugins)
+    annotate_components(themes)
+
+    # Check SSL certificate status and expiry
+    if ssl_valid and isinstance(ssl_info, datetime):
+        # SSL certificate is valid; calculate time until expiry
+        days_until_expiry = (ssl_info - current_time).days
+
+        # Set color based on days until expiry
+        if days_until_expiry > 30:
+            ssl_expiry_color = 'green'
+        elif days_until_expiry > 0:
+            ssl_expiry_color = 'orange'
         else:
-            # SSL certificate is invalid or an error occurred
-            ssl_status = "<span style='color:red;'>Invalid</span>"
-            ssl_expiry_date = "N/A"
             ssl_expiry_color = 'red'
 
-        # Get performance score
-        performance_score = get_performance_metrics(url)
-
-        # Perform malware scan
-        malware_scan = scan_for_malware(url)
-
-        # Check uptime status
-        uptime_status = check_uptime(url)
-
-        # Record the check time
-        checked_at = datetime.now(poland_tz).strftime('%Y-%m-%d %H:%M:%S') # Again - the time format is set for Poland.
-
-        # Compile all results for the site
-        result = {
-            'url': url,
-            'php_version': php_version,
-            'wp_version': wp_version,
-            'plugins': plugins,
-            'themes': themes,
-            'performance_score': performance_score,
-            'malware_scan': malware_scan,
-            'ssl_status': ssl_status,
-            'ssl_expiry_date': ssl_expiry_date,
-            'ssl_expiry_color': ssl_expiry_color,
-            'uptime_status': uptime_status,
-            'checked_at': checked_at
-        }
-        results.append(result)
+        ssl_status = "<span style='color:green;'>Valid</span>"
+        ssl_expiry_date = ssl_info.astimezone(POLAND_TZ).strftime('%Y-%m-%d') # Again - the time format is set for Poland.
+    else:
+        # SSL certificate is invalid or an error occurred
+        ssl_status = "<span style='color:red;'>Invalid</span>"
+        ssl_expiry_date = "N/A"
+        ssl_expiry_color = 'red'
 
-        time.sleep(5)  # Rate limiting: pause for 5 seconds between requests. Some hosing are eager to ban anything bothering their servers with questions.. This value can be modified to accomodate that.
+    # Record the check time
+    checked_at = datetime.now(POLAND_TZ).strftime('%Y-%m-%d %H:%M:%S') # Again - the time format is set for Poland.
 
-    # Prepare email content with neccessary information:
-    email_subject = "Installed PHP, WordPress & Plugins Version Check Results"
-    email_body = """
+    # Compile all results for the site
+    return {
+        'url': url,
+        'php_version': php_version,
+        'wp_version': wp_version,
+        'plugins': plugins,
+        'themes': themes,
+        'performance_score': performance_score,
+        'ssl_status': ssl_status,
+        'ssl_expiry_date': ssl_expiry_date,
+        'ssl_expiry_color': ssl_expiry_color,
+        'uptime_status': uptime_status,
+        'checked_at': checked_at
+    }
+
+async def process_all(urls):
+    """
+    Checks all sites concurrently over a single shared HTTP client.
+    
+    Instead of a fixed pause between sites, concurrency adapts to server health
+    (see AdaptiveConcurrency).
+    
+    Args:
+        urls (list): URLs of the WordPress sites
+    
+    Returns:
+        list: Results for each site, in the same order as urls
+    """
+    urls = [add_scheme(url.strip()) for url in urls]
+    current_time = datetime.now(POLAND_TZ)  # SSL expiry is counted in days, so one timestamp serves the whole run
+
+    # Start with a few sites at a time and let the limiter speed up or back off as servers respond
+    limiter = AdaptiveConcurrency()
+
+    async def limited_process_url(client, url):
+        async with limiter:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await process_url(client, url, current_time)
+            await limiter.record(loop.time() - started)  # One sample per finished site
+            return result
+
+    try:
+        async with create_client(limiter) as client:
+            # One Safe Browsing request covers every site
+            malware_scans, *results = await asyncio.gather(
+                scan_for_malware_batch(client, urls),
+                *[limited_process_url(client, url) for url in urls]
+            )
+    finally:
+        result_cache.close()
+
+    for result in results:
+        result['malware_scan'] = malware_scans[result['url']]
+    return results
+
+# Color of the latest version when an update is available
+UPDATE_COLOR = "#E67E22"  # Orange
+
+@lru_cache(maxsize=None)
+def parse_version(version):
+    """
+    Parses a version string, caching the result since the same versions repeat across sites.
+    
+    Args:
+        version (str): Version string, e.g. '1.10.0'
+    
+    Returns:
+        packaging.version.Version: Parsed version
+    
+    Raises:
+        packaging.version.InvalidVersion: If the string isn't a valid version
+    """
+    return Version(version)
+
+def needs_update(installed_version, latest_version):
+    """
+    Checks whether a newer version than the installed one is available.
+    
+    Versions are compared numerically, so '1.10.0' is newer than '1.9.0'.
+    
+    Args:
+        installed_version (str): Version installed on the site
+        latest_version (str): Latest known version or 'Unknown'
+    
+    Returns:
+        bool: True if latest_version is newer than installed_version
+    """
+    if latest_version == 'Unknown':
+        return False
+    try:
+        return parse_version(latest_version) > parse_version(installed_version)
+    except InvalidVersion:
+        return latest_version != installed_version  # Can't order non-standard versions; flag any difference
+
+# Report row for a plugin or theme, filled from the fields set by annotate_components()
+COMPONENT_ROW_TEMPLATE = """
+            <tr>
+                <td>{_name}</td>
+                <td>{_installed}</td>
+                <td style='color: {_color}'>{_display}</td>
+            </tr>
+            """
+
+def annotate_components(components):
+    """
+    Precomputes how each plugin or theme is shown in the report.
+    
+    Adds '_name', '_installed', '_color' and '_display' to each dict, so rendering
+    a row is a plain template substitution.
+    
+    Args:
+        components (list): Plugin or theme dicts with 'name', 'version' and 'latest_version'
+    
+    Returns:
+        None
+    """
+    for component in components:
+        latest_version = component['latest_version']
+        component['_name'] = html.escape(component.get('name', 'Unknown'))  # Names come from the site; don't let them inject HTML
+        component['_installed'] = html.escape(component['version'])
+        # Set color based on version comparison
+        component['_color'] = UPDATE_COLOR if needs_update(component['version'], latest_version) else "black"
+        if latest_version == 'Unknown':
+            component['_display'] = "<span style='color:red;'>Unknown</span>"
+        else:
+            component['_display'] = html.escape(latest_version)
+
+def build_email_body(results):
+    """
+    Builds the HTML report sent by email.
+    
+    The report is collected as a list of fragments and joined once at the end,
+    rather than growing a single string row by row.
+    
+    Args:
+        results (list): Results for each site, as returned by process_all()
+            (plugins and themes already passed through annotate_components())
+    
+    Returns:
+        str: Email body in HTML format
+    """
+    parts = ["""
     <html>
     <body>
     <h4>Website Checks:</h4>
@@ -451,15 +1159,15 @@ def main():
         <th style='padding: 8px; text-align: center;'>Uptime Status</th>
         <th style='padding: 8px; text-align: center;'>Checked At</th>
     </tr>
-    """
+    """]
 
     # Populate the email body with results
     for result in results:
-        email_body += f"""
+        parts.append(f"""
         <tr>
         <td style='padding: 8px; text-align: center;'>{result['url']}</td>
-        <td style='padding: 8px; text-align: center;'>{result['php_version']}</td>
-        <td style='padding: 8px; text-align: center;'>{result['wp_version']}</td>
+        <td style='padding: 8px; text-align: center;'>{html.escape(str(result['php_version']))}</td>
+        <td style='padding: 8px; text-align: center;'>{html.escape(str(result['wp_version']))}</td>
         <td style='padding: 8px; text-align: center; color: {result['ssl_expiry_color']}'>{result['ssl_status']}</td>
         <td style='padding: 8px; text-align: center; color: {result['ssl_expiry_color']}'>{result['ssl_expiry_date']}</td>
         <td style='padding: 8px; text-align: center;'>{result['performance_score']}</td>
@@ -467,19 +1175,19 @@ def main():
         <td style='padding: 8px; text-align: center;'>{result['uptime_status']}</td>
         <td style='padding: 8px; text-align: center;'>{result['checked_at']}</td>
         </tr>
-        """
+        """)
 
-    email_body += """
+    parts.append("""
     </table>
     <h3>Plugins and Themes</h3>
-    """
+    """)
 
     # Add plugin and theme details for each site
     for result in results:
-        email_body += f"<h4>{result['url']}</h4>"
+        parts.append(f"<h4>{result['url']}</h4>")
 
         # Plugins table
-        email_body += """
+        parts.append("""
         <h5>Plugins:</h5>
         <table border='1' style='border-collapse: collapse; width: 100%;'>
         <tr>
@@ -487,35 +1195,13 @@ def main():
             <th>Installed Version</th>
             <th>Latest Version</th>
         </tr>
-        """
-        for plugin in result['plugins']:
-            plugin_name = plugin.get('name', 'Unknown')
-            installed_version = plugin['version']
-            latest_version = plugin['latest_version']
-
-            # Set color based on version comparison
-            if latest_version != 'Unknown' and latest_version > installed_version:
-                version_color = "#E67E22"  # Orange for updates available
-            else:
-                version_color = "black"
-
-            if latest_version == 'Unknown':
-                latest_version_display = "<span style='color:red;'>Unknown</span>"
-            else:
-                latest_version_display = latest_version
-
-            email_body += f"""
-            <tr>
-                <td>{plugin_name}</td>
-                <td>{installed_version}</td>
-                <td style='color: {version_color}'>{latest_version_display}</td>
-            </tr>
-            """
+        """)
+        parts.extend(COMPONENT_ROW_TEMPLATE.format_map(plugin) for plugin in result['plugins'])
 
-        email_body += "</table>"
+        parts.append("</table>")
 
         # Themes table
-        email_body += """
+        parts.append("""
         <h5>Themes:</h5>
         <table border='1' style='border-collapse: collapse; width: 100%;'>
         <tr>
@@ -523,34 +1209,45 @@ def main():
             <th>Installed Version</th>
             <th>Latest Version</th>
         </tr>
-        """
-        for theme in result['themes']:
-            theme_name = theme['name']
-            installed_version = theme['version']
-            latest_version = theme['latest_version']
-
-            # Set color based on version comparison
-            if latest_version != 'Unknown' and latest_version > installed_version:
-                version_color = "#E67E22"  # Orange for updates available
-            else:
-                version_color = "black"
-
-            if latest_version == 'Unknown':
-                latest_version_display = "<span style='color:red;'>Unknown</span>"
-            else:
-                latest_version_display = latest_version
-
-            email_body += f"""
-            <tr>
-                <td>{theme_name}</td>
-                <td>{installed_version}</td>
-                <td style='color: {version_color}'>{latest_version_display}</td>
-            </tr>
-            """
+        """)
+        parts.extend(COMPONENT_ROW_TEMPLATE.format_map(theme) for theme in result['themes'])
+
+        parts.append("</table>")
 
-        email_body += "</table>"
+    parts.append("</body></html>")
 
-    email_body += "</body></html>"
+    return "".join(parts)
+
+def run_async(coroutine):
+    """
+    Runs a coroutine to completion on uvloop if it is installed, otherwise on the default asyncio loop.
+    
+    Args:
+        coroutine (coroutine): The coroutine to run
+    
+    Returns:
+        The coroutine's result
+    """
+    if uvloop is not None and hasattr(uvloop, 'run'):  # uvloop.run() needs uvloop 0.18+
+        return uvloop.run(coroutine)
+    return asyncio.run(coroutine)
+
+def main():
+    """
+    Main function to orchestrate the monitoring and reporting processes.
+    
+    Returns:
+        None
+    """
+    # Get the list of URLs and recipient emails from environment variables
+    urls = os.getenv('URLS').split(',')  # List of URLs to check
+    to_emails = os.getenv('TO_EMAIL').split(',')  # List of recipient email addresses
+
+    results = run_async(process_all(urls))  # List with the results for each site
+
+    # Prepare email content with neccessary information:
+    email_subject = "Installed PHP, WordPress & Plugins Version Check Results"
+    email_body = build_email_body(results)
 
     # Send the compiled email to recipients
     send_email(email_subject, email_body, to_emails)